@@ -1,13 +1,20 @@
-import json
+import asyncio
+import logging
+import operator
 import os
 import re
+import time
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 import dotenv
 from langchain.output_parsers import PydanticOutputParser
+from langchain_core.tools import BaseTool
 from langchain_mcp_adapters.tools import load_mcp_tools
 from langgraph.graph import END, StateGraph
+from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import create_react_agent
 from langgraph.prebuilt.chat_agent_executor import AgentState
 from mcp import ClientSession
@@ -15,9 +22,39 @@ from mcp.client.streamable_http import streamablehttp_client
 from pydantic import BaseModel, Field
 from uipath_langchain.chat.models import UiPathAzureChatOpenAI
 
+try:
+    # orjson parses large GitHub payloads noticeably faster when available
+    import orjson as _json
+except ImportError:
+    import json as _json
+
 dotenv.load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+UIPATH_MCP_SERVER_URL = os.getenv("UIPATH_MCP_SERVER_URL")
+UIPATH_ACCESS_TOKEN = os.getenv("UIPATH_ACCESS_TOKEN")
+
+MODEL_NAME = "gpt-4.1-2025-04-14"
+
+# Keep only data extraction tools
+# LLMs get confused with too many choices
+ALLOWED_TOOL_NAMES = frozenset({"get_pull_request_files", "get_file_contents"})
+
 AI_GENERATED_LABEL = "_/ai generated"
+REPLY_ID_PATTERN = re.compile(r"\[(\d+)\]")
+
+# Short-lived cache for MCP tool payloads that rarely change between
+# webhook events on the same PR (e.g. PR details).
+MCP_CACHE_TTL_SECONDS = 60
+MCP_CACHE_MAX_ENTRIES = 512
+_mcp_cache: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], Tuple[float, Any]] = {}
+
+# Interval between pings on the shared MCP session
+MCP_KEEPALIVE_SECONDS = 60
+
+# MCP connection reused across make_graph calls
+_connection: Optional["McpConnection"] = None
 
 
 class PullRequestInfo(BaseModel):
@@ -30,7 +67,8 @@ class PullRequestInfo(BaseModel):
     command: str = Field(default="review")
 
 
-class PullRequestComment(BaseModel):
+@dataclass(slots=True)
+class PullRequestComment:
     """Human or AI message extracted from Pull Request reviews/comments/issues"""
 
     id: int
@@ -38,6 +76,16 @@ class PullRequestComment(BaseModel):
     role: str
     in_reply_to: Optional[int]
     created_at: Optional[str]
+    # Sort key parsed once from created_at, items without a timestamp
+    # (e.g. pending reviews) go last
+    created_ts: float = field(init=False)
+
+    def __post_init__(self):
+        self.created_ts = (
+            datetime.fromisoformat(self.created_at).timestamp()
+            if self.created_at
+            else float("inf")
+        )
 
 
 class PullRequestFile(BaseModel):
@@ -50,6 +98,54 @@ class PullRequestCommit(BaseModel):
     files: List[PullRequestFile]
 
 
+COMMIT_DATA_PARSER = PydanticOutputParser(pydantic_object=PullRequestCommit)
+COMMIT_FORMAT_INSTRUCTIONS = COMMIT_DATA_PARSER.get_format_instructions()
+
+# System prompts are formatted per agent turn, only the PR coordinates
+# and the current command change between calls
+REVIEWER_PROMPT_TEMPLATE = """
+You are a professional developer and GitHub reviewer.
+
+You are reviewing Pull Request #{pull_number} in repo `{owner}/{repo}`.
+
+YOU MUST FOLLOW THESE RULES WITHOUT EXCEPTION:
+
+1. ALWAYS BEGIN WITH the contents of the changed files BEFORE doing anything else.
+2. ALWAYS use the contents of the changed files as context.
+3. ALWAYS start ALL responses with exactly: "{label}" (no exceptions).
+
+COMMANDS you can receive:
+- "review": Do a complete code review, pointing out issues and good practices.
+- "summarize": Summarize the PR changes.
+- "suggest": Suggest improvements.
+- "test": Suggest tests for the changes.
+
+IMPORTANT:
+- Do not make assumptions.
+- Do not skip steps.
+- If you cannot complete the command for any reason, you MUST reply with an error comment.
+
+{command_message}
+"""
+
+DEVELOPER_PROMPT_TEMPLATE = """
+You are a GitHub AI assistant helping to manage Pull Requests.
+
+You are working on Pull Request #{pull_number} in repo `{owner}/{repo}`.
+
+Your current task: **Prepare a commit based on the latest suggestion, review, or test feedback.**
+
+**Strict Protocol:**
+1. MUST ALWAYS use the **latest suggestion, test, or review** from the conversation history to identify the changes to be made to the code.
+2. MUST ALWAYS get the contents of the latest changed files BEFORE writing any response.
+3. MUST ALWAYS think carefully about the file changes you want to apply.
+4. MUST ALWAYS output JUST the json with this format:
+{format_instructions}
+
+Begin generating the commit data now, based on the most recent suggestion, review, or test.
+"""
+
+
 class GraphState(AgentState):
     """Graph state"""
 
@@ -61,18 +157,60 @@ class GraphState(AgentState):
     command: str
 
 
-def process_comment(comment) -> PullRequestComment:
-    """Process a GitHub comment and return a PullRequestComment."""
+async def fetch_tool_json(
+    session: ClientSession, name: str, arguments: Dict[str, Any]
+) -> Any:
+    """Call an MCP tool and return its parsed JSON payload."""
+
+    tool_result = await session.call_tool(name, arguments)
+    if tool_result.isError:
+        raise ValueError(f"Tool '{name}' failed: {tool_result.content}")
+    return _json.loads(tool_result.content[0].text)
+
+
+async def cached_call_tool(
+    session: ClientSession,
+    name: str,
+    arguments: Dict[str, Any],
+    ttl: float = MCP_CACHE_TTL_SECONDS,
+) -> Any:
+    """Call an MCP tool and return its parsed JSON payload, reusing recent results."""
+
+    key = (name, tuple(sorted(arguments.items())))
+    now = time.monotonic()
+    cached = _mcp_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    payload = await fetch_tool_json(session, name, arguments)
+    if len(_mcp_cache) >= MCP_CACHE_MAX_ENTRIES:
+        for expired in [k for k, (exp, _) in _mcp_cache.items() if exp <= now]:
+            del _mcp_cache[expired]
+        if len(_mcp_cache) >= MCP_CACHE_MAX_ENTRIES:
+            _mcp_cache.clear()
+    _mcp_cache[key] = (now + ttl, payload)
+    return payload
+
+
+def process_comment(comment) -> Optional[PullRequestComment]:
+    """Process a GitHub comment and return a PullRequestComment.
+
+    Returns None for comments without any text (e.g. bare review approvals).
+    """
+
+    body = comment.get("body") or ""
+    if not body or body.isspace():
+        return None
 
     in_reply_to = None
     created_at = comment.get("created_at") or comment.get("submitted_at")
-    if comment["body"].startswith(AI_GENERATED_LABEL):
+    if body.startswith(AI_GENERATED_LABEL):
         # Parse in_reply_to from the AI label
-        match = re.search(r"\[(\d+)\]", comment["body"])
+        match = REPLY_ID_PATTERN.search(body)
         if match:
             in_reply_to = int(match.group(1))
         return PullRequestComment(
-            body=comment["body"].strip(),
+            body=body.strip(),
             role="assistant",
             created_at=created_at,
             id=comment["id"],
@@ -80,7 +218,7 @@ def process_comment(comment) -> PullRequestComment:
         )
     else:
         # /help confuses the LLM
-        message = comment["body"].replace("/help", "").strip()
+        message = body.replace("/help", "").strip()
         path = comment.get("path")
         line = comment.get("line")
         if path and line:
@@ -94,282 +232,294 @@ def process_comment(comment) -> PullRequestComment:
         )
 
 
-@asynccontextmanager
-async def make_graph():
-    async with streamablehttp_client(
-        url=os.getenv("UIPATH_MCP_SERVER_URL"),
-        headers={"Authorization": f"Bearer {os.getenv('UIPATH_ACCESS_TOKEN')}"},
-        timeout=60,
-    ) as (read, write, session_id_callback):
-        async with ClientSession(read, write) as session:
-            all_tools = await load_mcp_tools(session)
-
-            # Keep only data extraction tools
-            # LLMs get confused with too many choices
-            allowed_tool_names = {
-                "get_pull_request_files",
-                "get_file_contents",
-            }
-
-            tools = [tool for tool in all_tools if tool.name in allowed_tool_names]
-
-            model = UiPathAzureChatOpenAI(
-                model="gpt-4.1-2025-04-14",
-                temperature=0,
-                max_tokens=10000,
-                timeout=120,
-                max_retries=2,
-            )
-
-            commit_data_parser = PydanticOutputParser(pydantic_object=PullRequestCommit)
-
-            # Create the conversation history
-            async def hydrate_history(input: PullRequestInfo) -> GraphState:
-                """Fetch PR context at the start of the workflow."""
-
-                pr_history: List[PullRequestComment] = []
-
-                # Fetch PR details
-                tool_result = await session.call_tool(
-                    "get_pull_request",
-                    {
-                        "owner": input.owner,
-                        "repo": input.repo,
-                        "pullNumber": input.pullNumber,
-                    },
-                )
-
-                pr_details = json.loads(tool_result.content[0].text)
-                pr_body = pr_details.get("body") or ""
-                pr_branch = pr_details.get("head").get("ref")
-
-                # Add PR details as the first human message
-                pr_history.append(
-                    PullRequestComment(
-                        body=f"Pull Request #{input.pullNumber} by {pr_details['user']['login']}\nTitle: {pr_details['title']}\nDescription: {pr_body}",
-                        role="user",
-                        created_at=pr_details["created_at"],
-                        id=pr_details["id"],
-                        in_reply_to=None,
-                    )
-                )
-
-                # Fetch PR comments
-                tool_result = await session.call_tool(
-                    "get_pull_request_comments",
-                    {
-                        "owner": input.owner,
-                        "repo": input.repo,
-                        "pullNumber": input.pullNumber,
-                    },
-                )
-                comments = json.loads(tool_result.content[0].text)
-                for comment in comments:
-                    pr_history.append(process_comment(comment))
-
-                # Fetch PR review comments
-                tool_result = await session.call_tool(
-                    "get_pull_request_reviews",
-                    {
-                        "owner": input.owner,
-                        "repo": input.repo,
-                        "pullNumber": input.pullNumber,
-                    },
-                )
-                review_comments = json.loads(tool_result.content[0].text)
-                for comment in review_comments:
-                    pr_history.append(process_comment(comment))
-
-                # Fetch issue comments
-                tool_result = await session.call_tool(
-                    "get_issue_comments",
-                    {
-                        "owner": input.owner,
-                        "repo": input.repo,
-                        "issue_number": input.pullNumber,
-                        "page": 1,
-                        "per_page": 100,
-                    },
-                )
-                issue_comments = json.loads(tool_result.content[0].text)
-                for comment in issue_comments:
-                    pr_history.append(process_comment(comment))
-
-                # Sort chat items by created_at timestamp
-                pr_history.sort(key=lambda item: item.created_at)
-
-                messages = []
-                for item in pr_history:
-                    messages.append(
-                        {
-                            "role": item.role,
-                            "content": item.body,
-                            "metadata": {
-                                "id": item.id,
-                                "created_at": item.created_at,
-                                "in_reply_to": item.in_reply_to,
-                            },
-                        }
-                    )
-
-                # Update the state with the hydrated conversation history
-                return {
+def build_graph(session: ClientSession, tools: List[BaseTool]) -> CompiledStateGraph:
+    """Build and compile the helper workflow on top of an open MCP session."""
+
+    model = UiPathAzureChatOpenAI(
+        model=MODEL_NAME,
+        temperature=0,
+        max_tokens=10000,
+        timeout=120,
+        max_retries=2,
+    )
+
+    # Create the conversation history
+    async def hydrate_history(input: PullRequestInfo) -> GraphState:
+        """Fetch PR context at the start of the workflow."""
+
+        pr_history: List[PullRequestComment] = []
+
+        pr_args = {
+            "owner": input.owner,
+            "repo": input.repo,
+            "pullNumber": input.pullNumber,
+        }
+
+        # Fetch PR details and all comment sources concurrently.
+        # Comments are always fetched fresh since the triggering
+        # comment must be part of the history
+        pr_details, *comment_sources = await asyncio.gather(
+            cached_call_tool(session, "get_pull_request", pr_args),
+            fetch_tool_json(session, "get_pull_request_comments", pr_args),
+            fetch_tool_json(session, "get_pull_request_reviews", pr_args),
+            fetch_tool_json(
+                session,
+                "get_issue_comments",
+                {
                     "owner": input.owner,
                     "repo": input.repo,
-                    "pull_number": input.pullNumber,
-                    "branch": pr_branch,
-                    "in_reply_to": input.commentNumber,
-                    "messages": messages,
-                }
-
-            def reviewer_prompt(state: GraphState) -> GraphState:
-                in_reply_to = state.get("in_reply_to")
-                if in_reply_to:
-                    label = f"{AI_GENERATED_LABEL} [{in_reply_to}]_\n"
-                    command_message = f"The CURRENT command is '{state['command']}'. EXECUTE the CURRENT command in_reply_to #{in_reply_to} and provide detailed feedback."
-                else:
-                    label = f"{AI_GENERATED_LABEL}_\n"
-                    command_message = f"The CURRENT command is '{state['command']}'. EXECUTE the CURRENT command and provide detailed feedback."
-
-                system_message = f"""
-You are a professional developer and GitHub reviewer.
-
-You are reviewing Pull Request #{state["pull_number"]} in repo `{state["owner"]}/{state["repo"]}`.
-
-YOU MUST FOLLOW THESE RULES WITHOUT EXCEPTION:
-
-1. ALWAYS BEGIN WITH the contents of the changed files BEFORE doing anything else.
-2. ALWAYS use the contents of the changed files as context.
-3. ALWAYS start ALL responses with exactly: "{label}" (no exceptions).
-
-COMMANDS you can receive:
-- "review": Do a complete code review, pointing out issues and good practices.
-- "summarize": Summarize the PR changes.
-- "suggest": Suggest improvements.
-- "test": Suggest tests for the changes.
-
-IMPORTANT:
-- Do not make assumptions.
-- Do not skip steps.
-- If you cannot complete the command for any reason, you MUST reply with an error comment.
-
-{command_message}
-                """
-
-                return [{"role": "system", "content": system_message}] + state[
-                    "messages"
-                ]
+                    "issue_number": input.pullNumber,
+                    "page": 1,
+                    "per_page": 100,
+                },
+            ),
+        )
 
-            # Create the reviewer node, this one should post review comments
-            # using its available GitHub tools
-            reviewer_agent = create_react_agent(
-                model, tools=tools, state_schema=GraphState, prompt=reviewer_prompt
+        pr_body = pr_details.get("body") or ""
+        pr_branch = pr_details.get("head").get("ref")
+
+        # Add PR details as the first human message
+        pr_history.append(
+            PullRequestComment(
+                body=f"Pull Request #{input.pullNumber} by {pr_details['user']['login']}\nTitle: {pr_details['title']}\nDescription: {pr_body}",
+                role="user",
+                created_at=pr_details["created_at"],
+                id=pr_details["id"],
+                in_reply_to=None,
             )
+        )
 
-            async def reviewer_node(state: GraphState) -> GraphState:
-                result = await reviewer_agent.ainvoke(state)
-
-                # Add the LLM's response to the conversation history
-                updated_messages = state["messages"] + result["messages"]
-
-                # Actually post the review
-                tool_result = await session.call_tool(
-                    "create_pull_request_review",
-                    {
-                        "owner": state["owner"],
-                        "repo": state["repo"],
-                        "pullNumber": state["pull_number"],
-                        "body": result["messages"][-1].content,
-                        "event": "COMMENT",
-                    },
-                )
-                if tool_result.isError:
-                    raise ValueError(f"Failed to post review: {tool_result.content}")
-
-                return {
-                    **state,
-                    "messages": updated_messages,
-                }
-
-            # Create the developer node, this one should push commits
-            # using its available GitHub tools
-            def developer_prompt(state: GraphState) -> GraphState:
-                system_message = f"""
-You are a GitHub AI assistant helping to manage Pull Requests.
-
-You are working on Pull Request #{state["pull_number"]} in repo `{state["owner"]}/{state["repo"]}`.
-
-Your current task: **Prepare a commit based on the latest suggestion, review, or test feedback.**
-
-**Strict Protocol:**
-1. MUST ALWAYS use the **latest suggestion, test, or review** from the conversation history to identify the changes to be made to the code.
-2. MUST ALWAYS get the contents of the latest changed files BEFORE writing any response.
-3. MUST ALWAYS think carefully about the file changes you want to apply.
-4. MUST ALWAYS output JUST the json with this format:
-{commit_data_parser.get_format_instructions()}
+        # Add PR comments, review comments and issue comments
+        for comments in comment_sources:
+            pr_history.extend(filter(None, map(process_comment, comments)))
+
+        # Sort chat items by created_at timestamp
+        pr_history.sort(key=operator.attrgetter("created_ts"))
+
+        messages = [
+            {
+                "role": item.role,
+                "content": item.body,
+                "metadata": {
+                    "id": item.id,
+                    "created_at": item.created_at,
+                    "in_reply_to": item.in_reply_to,
+                },
+            }
+            for item in pr_history
+        ]
+
+        # Update the state with the hydrated conversation history
+        return {
+            "owner": input.owner,
+            "repo": input.repo,
+            "pull_number": input.pullNumber,
+            "branch": pr_branch,
+            "in_reply_to": input.commentNumber,
+            "messages": messages,
+        }
+
+    def reviewer_prompt(state: GraphState) -> GraphState:
+        in_reply_to = state.get("in_reply_to")
+        if in_reply_to:
+            label = f"{AI_GENERATED_LABEL} [{in_reply_to}]_\n"
+            command_message = f"The CURRENT command is '{state['command']}'. EXECUTE the CURRENT command in_reply_to #{in_reply_to} and provide detailed feedback."
+        else:
+            label = f"{AI_GENERATED_LABEL}_\n"
+            command_message = f"The CURRENT command is '{state['command']}'. EXECUTE the CURRENT command and provide detailed feedback."
+
+        system_message = REVIEWER_PROMPT_TEMPLATE.format(
+            pull_number=state["pull_number"],
+            owner=state["owner"],
+            repo=state["repo"],
+            label=label,
+            command_message=command_message,
+        )
 
-Begin generating the commit data now, based on the most recent suggestion, review, or test.
-                """
+        return [{"role": "system", "content": system_message}] + state["messages"]
+
+    # Create the reviewer node, this one should post review comments
+    # using its available GitHub tools
+    reviewer_agent = create_react_agent(
+        model, tools=tools, state_schema=GraphState, prompt=reviewer_prompt
+    )
+
+    async def reviewer_node(state: GraphState) -> GraphState:
+        result = await reviewer_agent.ainvoke(state)
+
+        # Add the LLM's response to the conversation history
+        updated_messages = state["messages"] + result["messages"]
+
+        # Actually post the review
+        tool_result = await session.call_tool(
+            "create_pull_request_review",
+            {
+                "owner": state["owner"],
+                "repo": state["repo"],
+                "pullNumber": state["pull_number"],
+                "body": result["messages"][-1].content,
+                "event": "COMMENT",
+            },
+        )
+        if tool_result.isError:
+            raise ValueError(f"Failed to post review: {tool_result.content}")
+
+        return {
+            **state,
+            "messages": updated_messages,
+        }
+
+    # Create the developer node, this one should push commits
+    # using its available GitHub tools
+    def developer_prompt(state: GraphState) -> GraphState:
+        system_message = DEVELOPER_PROMPT_TEMPLATE.format(
+            pull_number=state["pull_number"],
+            owner=state["owner"],
+            repo=state["repo"],
+            format_instructions=COMMIT_FORMAT_INSTRUCTIONS,
+        )
 
-                return [{"role": "system", "content": system_message}] + state[
-                    "messages"
-                ]
+        return [{"role": "system", "content": system_message}] + state["messages"]
+
+    developer_agent = create_react_agent(
+        model, tools=tools, state_schema=GraphState, prompt=developer_prompt
+    )
+
+    async def developer_node(state: GraphState) -> GraphState:
+        result = await developer_agent.ainvoke(state)
+        # Add the LLM's response to the conversation history
+        updated_messages = state["messages"] + result["messages"]
+
+        # Parse the commit data from the LLM's last message
+        commit_data = COMMIT_DATA_PARSER.parse(result["messages"][-1].content)
+
+        # Actually push the commit
+        tool_result = await session.call_tool(
+            "push_files",
+            {
+                "owner": state["owner"],
+                "repo": state["repo"],
+                "pullNumber": state["pull_number"],
+                "branch": state["branch"],
+                "message": commit_data.message,
+                "files": commit_data.files,
+            },
+        )
+        if tool_result.isError:
+            raise ValueError(f"Failed to push files: {tool_result.content}")
+
+        return {
+            **state,
+            "messages": updated_messages,
+        }
+
+    # Build the workflow
+    workflow = StateGraph(GraphState, input=PullRequestInfo)
+
+    workflow.add_node("hydrate_history", hydrate_history)
+    workflow.add_node("reviewer_node", reviewer_node)
+    workflow.add_node("developer_node", developer_node)
+
+    workflow.add_edge("__start__", "hydrate_history")
+
+    # If command is "commit", go to developer_node
+    workflow.add_conditional_edges(
+        "hydrate_history",
+        lambda input: (
+            "developer_node" if input.command == "commit" else "reviewer_node"
+        ),
+        {
+            "developer_node": "developer_node",
+            "reviewer_node": "reviewer_node",
+            END: END,
+        },
+    )
+
+    # Compile the graph
+    return workflow.compile()
+
+
+@dataclass
+class McpConnection:
+    """MCP session shared by all make_graph calls on one event loop.
+
+    The transport and session contexts run anyio task groups whose cancel
+    scopes belong to the task that entered them, so a single owner task
+    enters them, serves the session and exits them again. When the event
+    loop shuts down, asyncio.run cancels the owner task, which unwinds the
+    session in that same task.
+    """
+
+    loop: asyncio.AbstractEventLoop
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task[None]] = None
+    session: Optional[ClientSession] = None
+    tools: List[BaseTool] = field(default_factory=list)
+    error: Optional[BaseException] = None
+    # Graphs compiled on top of this session, dropped together with it
+    graphs: Dict[Tuple[str, Tuple[str, ...]], CompiledStateGraph] = field(
+        default_factory=dict
+    )
+
+
+async def serve_connection(connection: McpConnection) -> None:
+    """Open the MCP session and keep it alive until cancelled or a ping fails."""
+
+    try:
+        async with streamablehttp_client(
+            url=UIPATH_MCP_SERVER_URL,
+            headers={"Authorization": f"Bearer {UIPATH_ACCESS_TOKEN}"},
+            timeout=60,
+        ) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                connection.tools = await load_mcp_tools(session)
+                connection.session = session
+                connection.ready.set()
+
+                # Ping the server so an idle session is not dropped
+                while True:
+                    await asyncio.sleep(MCP_KEEPALIVE_SECONDS)
+                    await session.send_ping()
+    except Exception as e:
+        logger.warning("MCP session closed, reconnecting on next use: %s", e)
+        connection.error = e
+    finally:
+        connection.session = None
+        connection.graphs.clear()
+        # Wake up callers still waiting on a connection that never came up
+        connection.ready.set()
+
+
+async def get_connection() -> McpConnection:
+    """Return the shared MCP connection, connecting on first use.
+
+    The session stays open for the lifetime of the event loop so repeated
+    make_graph calls skip the transport handshake and tool discovery.
+    """
+    global _connection
+
+    loop = asyncio.get_running_loop()
+    connection = _connection
+    if connection is None or connection.loop is not loop or connection.task.done():
+        connection = McpConnection(loop=loop)
+        connection.task = loop.create_task(serve_connection(connection))
+        _connection = connection
+
+    await connection.ready.wait()
+    if connection.session is None:
+        raise RuntimeError("Could not connect to the MCP server") from connection.error
+    return connection
 
-            developer_agent = create_react_agent(
-                model, tools=tools, state_schema=GraphState, prompt=developer_prompt
-            )
 
-            async def developer_node(state: GraphState) -> GraphState:
-                result = await developer_agent.ainvoke(state)
-                # Add the LLM's response to the conversation history
-                updated_messages = state["messages"] + result["messages"]
-
-                # Parse the commit data from the LLM's last message
-                commit_data = commit_data_parser.parse(result["messages"][-1].content)
-
-                # Actually push the commit
-                tool_result = await session.call_tool(
-                    "push_files",
-                    {
-                        "owner": state["owner"],
-                        "repo": state["repo"],
-                        "pullNumber": state["pull_number"],
-                        "branch": state["branch"],
-                        "message": commit_data.message,
-                        "files": commit_data.files,
-                    },
-                )
-                if tool_result.isError:
-                    raise ValueError(f"Failed to push files: {tool_result.content}")
-
-                return {
-                    **state,
-                    "messages": updated_messages,
-                }
-
-            # Build the workflow
-            workflow = StateGraph(GraphState, input=PullRequestInfo)
-
-            workflow.add_node("hydrate_history", hydrate_history)
-            workflow.add_node("reviewer_node", reviewer_node)
-            workflow.add_node("developer_node", developer_node)
-
-            workflow.add_edge("__start__", "hydrate_history")
-
-            # If command is "commit", go to developer_node
-            workflow.add_conditional_edges(
-                "hydrate_history",
-                lambda input: "developer_node"
-                if input.command == "commit"
-                else "reviewer_node",
-                {
-                    "developer_node": "developer_node",
-                    "reviewer_node": "reviewer_node",
-                    END: END,
-                },
-            )
+@asynccontextmanager
+async def make_graph():
+    connection = await get_connection()
+    tools = [tool for tool in connection.tools if tool.name in ALLOWED_TOOL_NAMES]
 
-            # Compile the graph
-            graph = workflow.compile()
+    key = (MODEL_NAME, tuple(sorted(tool.name for tool in tools)))
+    graph = connection.graphs.get(key)
+    if graph is None:
+        graph = build_graph(connection.session, tools)
+        connection.graphs[key] = graph
 
-            yield graph
+    yield graph
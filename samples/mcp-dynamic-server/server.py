@@ -1,3 +1,5 @@
+import ast
+from types import CodeType
 from typing import Any, Dict
 
 from mcp.server.fastmcp import FastMCP
@@ -6,6 +8,168 @@ from mcp.server.fastmcp import FastMCP
 mcp = FastMCP("Self-Extending MCP Server")
 
 
+class InvalidToolCodeError(ValueError):
+    """Raised when tool code is rejected before being executed."""
+
+
+def _is_inert(node: ast.AST, annotation: bool = False) -> bool:
+    """Check whether evaluating an expression only looks up names and builds literals.
+
+    Annotations may also use subscripts and unions, e.g. list[int] or str | None.
+    """
+    if isinstance(node, ast.Constant):
+        return True
+    if isinstance(node, ast.Name):
+        return isinstance(node.ctx, ast.Load)
+    if isinstance(node, ast.Attribute):
+        return isinstance(node.ctx, ast.Load) and _is_inert(node.value, annotation)
+    if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        return all(_is_inert(element, annotation) for element in node.elts)
+    if isinstance(node, ast.Dict):
+        return all(
+            key is not None and _is_inert(key, annotation) for key in node.keys
+        ) and all(_is_inert(value, annotation) for value in node.values)
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant)
+    if isinstance(node, ast.Lambda):
+        # The body only runs when called, the defaults run when defined
+        return all(_is_inert(default) for default in _defaults(node.args))
+    if annotation and isinstance(node, ast.Subscript):
+        return _is_inert(node.value, True) and _is_inert(node.slice, True)
+    if annotation and isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _is_inert(node.left, True) and _is_inert(node.right, True)
+    return False
+
+
+def _defaults(arguments: ast.arguments) -> list[ast.expr]:
+    """Get the default values of a function signature."""
+    return [
+        *arguments.defaults,
+        *(default for default in arguments.kw_defaults if default is not None),
+    ]
+
+
+def _is_literal(node: ast.expr) -> bool:
+    """Check whether an expression is a plain literal value."""
+    try:
+        ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return False
+    return True
+
+
+def _check_definition_time_code(node: ast.stmt) -> None:
+    """Reject expressions that run code when a function or class is defined."""
+    if isinstance(node, ast.ClassDef):
+        expressions = [
+            *node.decorator_list,
+            *node.bases,
+            *(keyword.value for keyword in node.keywords),
+        ]
+        annotations = []
+    else:
+        arguments = node.args
+        expressions = [*node.decorator_list, *_defaults(arguments)]
+        annotations = [
+            arg.annotation
+            for arg in (
+                *arguments.posonlyargs,
+                *arguments.args,
+                arguments.vararg,
+                *arguments.kwonlyargs,
+                arguments.kwarg,
+            )
+            if arg is not None and arg.annotation is not None
+        ]
+        if node.returns is not None:
+            annotations.append(node.returns)
+
+    if not all(map(_is_inert, expressions)) or not all(
+        _is_inert(annotation, annotation=True) for annotation in annotations
+    ):
+        raise InvalidToolCodeError(
+            f"'{node.name}' on line {node.lineno} runs code when it is defined. "
+            "Decorators, base classes, defaults and annotations may only use names and literals"
+        )
+
+
+def _check_statements(body: list[ast.stmt]) -> None:
+    """Check that statements only define things, without running code on exec.
+
+    Imports are allowed and run the imported module's own code.
+    """
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.Pass)):
+            continue
+        # Allow docstrings and other bare constants
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            continue
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            # Function bodies only run when the tool is called
+            _check_definition_time_code(node)
+            continue
+        if isinstance(node, ast.ClassDef):
+            # Class bodies run when the class is defined
+            _check_definition_time_code(node)
+            _check_statements(node.body)
+            continue
+        if isinstance(node, ast.Assign):
+            # Only plain names, assigning to attributes or items could change other modules
+            if all(
+                isinstance(target, ast.Name) for target in node.targets
+            ) and _is_literal(node.value):
+                continue
+        elif isinstance(node, ast.AnnAssign):
+            if (
+                isinstance(node.target, ast.Name)
+                and _is_inert(node.annotation, annotation=True)
+                and (node.value is None or _is_literal(node.value))
+            ):
+                continue
+        elif isinstance(node, ast.If):
+            # e.g. if TYPE_CHECKING: around typing-only imports
+            if _is_inert(node.test):
+                _check_statements(node.body)
+                _check_statements(node.orelse)
+                continue
+        elif isinstance(node, ast.Try):
+            # e.g. try/except ImportError around optional imports
+            if not any(
+                handler.type is not None and not _is_inert(handler.type)
+                for handler in node.handlers
+            ):
+                for handler in node.handlers:
+                    _check_statements(handler.body)
+                for block in (node.body, node.orelse, node.finalbody):
+                    _check_statements(block)
+                continue
+
+        raise InvalidToolCodeError(
+            f"Unsupported statement '{type(node).__name__}' on line {node.lineno}. "
+            "Outside of functions, tool code may only contain imports (which run the imported "
+            "module), literal values assigned to names, classes and function definitions"
+        )
+
+
+def validate_tool_code(name: str, tree: ast.Module) -> None:
+    """Check that parsed tool code contains the tool function and exec only runs definitions and imports."""
+    _check_statements(tree.body)
+
+    if not any(
+        isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == name
+        for node in tree.body
+    ):
+        raise InvalidToolCodeError(f"Valid function '{name}' not found in code")
+
+
+def compile_tool_code(name: str, code: str) -> CodeType:
+    """Validate tool source code and compile it without running it."""
+    filename = f"<tool:{name}>"
+    tree = ast.parse(code, filename=filename)
+    validate_tool_code(name, tree)
+    return compile(tree, filename, "exec")
+
+
 @mcp.tool()
 def add_tool(
     name: str = None,
@@ -42,15 +206,17 @@ def add_tool(
             }
 
         # Check if tool already exists
-        existing_tools = [tool.name for tool in mcp._tool_manager.list_tools()]
-        if name in existing_tools:
+        if mcp._tool_manager.get_tool(name) is not None:
             return {"status": "error", "message": f"Tool '{name}' already exists"}
 
         # Validate the code
         try:
+            # Check the code before running any of it
+            code_obj = compile_tool_code(name, code)
+
             # Add the tool function to the global namespace
             namespace = {}
-            exec(code, namespace)
+            exec(code_obj, namespace)
 
             if name not in namespace or not callable(namespace[name]):
                 return {
@@ -69,6 +235,8 @@ def add_tool(
                 "inputSchema": inputSchema,
             }
 
+        except InvalidToolCodeError as e:
+            return {"status": "error", "message": str(e)}
         except SyntaxError as e:
             return {
                 "status": "error",
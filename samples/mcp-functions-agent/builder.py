@@ -1,3 +1,4 @@
+import logging
 import os
 from contextlib import asynccontextmanager
 
@@ -14,6 +15,8 @@ from uipath_langchain.chat.models import UiPathAzureChatOpenAI
 
 dotenv.load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class GraphInput(BaseModel):
     """Input containing a query about what function to build"""
@@ -114,7 +117,9 @@ Expected Behavior: {state.get("expected_behavior")}
 """
 
                 if state.get("validation_feedback"):
-                    print(state.get("validation_feedback"))
+                    logger.debug(
+                        "Validation feedback: %s", state.get("validation_feedback")
+                    )
                     system_message += f"""
 Previous validation feedback:
 {state.get("validation_feedback")}
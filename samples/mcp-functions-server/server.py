@@ -1,16 +1,142 @@
-from typing import Any, Callable, Dict, List, Optional
-
+import ast
+import bisect
+import hashlib
+import inspect
+import sys
+import typing
+from dataclasses import dataclass
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jsonschema import exceptions as jsonschema_exceptions
+from jsonschema import validators
 from mcp.server.fastmcp import FastMCP
 
 # Initialize the MCP server
 mcp = FastMCP("Code Functions MCP Server")
 
+# Names of the tools exposed by this server itself
+BUILT_IN_FUNCTION_NAMES = frozenset({"get_functions", "add_function", "call_function"})
+
+
+# Latest compiled source per function name, as (source digest, code object).
+# Replaced on every update, so it never holds more than one entry per name
+_code_cache: Dict[str, Tuple[str, CodeType]] = {}
+
+# JSON schema types for the Python annotations we can map directly
+JSON_SCHEMA_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    tuple: "array",
+    dict: "object",
+}
+
+
+def infer_input_schema(func: Callable) -> Dict[str, Any]:
+    """Build a JSON schema for the function parameters from its signature."""
+    try:
+        sig = inspect.signature(func)
+    except (TypeError, ValueError):
+        return {}
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception:
+        hints = {}
+
+    properties = {}
+    required = []
+    for param in sig.parameters.values():
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        hint = hints.get(param.name)
+        hint_type = typing.get_origin(hint) or hint
+        # Annotations are arbitrary expressions, only map actual classes
+        json_type = (
+            JSON_SCHEMA_TYPES.get(hint_type) if isinstance(hint_type, type) else None
+        )
+        properties[param.name] = {"type": json_type} if json_type else {}
+        if param.default is param.empty:
+            required.append(param.name)
+
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def build_usage_example(name: str, params: Dict[str, Any]) -> str:
+    """Build a call_function usage example with placeholder argument values."""
+    # Handle different possible inputSchema structures
+    if isinstance(params, dict):
+        # Standard JSON Schema format, or a simple dict of param_name -> description
+        param_names = params["properties"] if "properties" in params else params
+        args = ", ".join(f"'{param}': <{param}_value>" for param in param_names)
+    else:
+        args = ""
+
+    # If no parameters found or empty schema, provide generic example
+    if not args:
+        args = "'param1': <value1>, 'param2': <value2>"
+
+    return f"call_function(name='{name}', args={{{args}}})"
+
+
+def build_validator(params: Dict[str, Any]) -> Optional[Any]:
+    """Build a JSON schema validator for the inputSchema, if it is a JSON schema."""
+    # Simple dicts of param_name -> description are documentation only
+    if not isinstance(params, dict) or not ("type" in params or "properties" in params):
+        return None
+    validator_cls = validators.validator_for(params)
+    try:
+        validator_cls.check_schema(params)
+    except jsonschema_exceptions.SchemaError:
+        return None
+    return validator_cls(params)
+
+
+class InvalidFunctionCodeError(ValueError):
+    """Raised when function code is rejected before being executed."""
+
+
+def compile_function_code(name: str, code: str) -> CodeType:
+    """Compile function source code, reusing the code object for an unchanged source."""
+    digest = hashlib.blake2b(code.encode(), digest_size=16).hexdigest()
+    cached = _code_cache.get(name)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    filename = f"<function:{name}>"
+    tree = ast.parse(code, filename=filename)
+    if not any(
+        isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == name
+        for node in tree.body
+    ):
+        raise InvalidFunctionCodeError(
+            f"Function '{name}' not found in the provided code"
+        )
+    code_obj = compile(tree, filename, "exec")
+    _code_cache[name] = (digest, code_obj)
+    return code_obj
+
+
+@dataclass(slots=True)
+class FunctionEntry:
+    """A registered function together with its metadata"""
+
+    func: Callable
+    metadata: Dict[str, Any]
+    usage_example: str
+    validator: Optional[Any] = None  # validates call args against the inputSchema
+
 
 # Functions registry to track dynamically added code functions
 class FunctionRegistry:
+    __slots__ = ("_entries", "_sorted_names", "_listing")
+
     def __init__(self):
-        self.functions = {}  # name -> function
-        self.metadata = {}  # name -> metadata
+        self._entries = {}  # name -> FunctionEntry
+        self._sorted_names = []  # names, kept sorted on register
+        self._listing = None  # cached list_functions result, reset on register
 
     def register(
         self,
@@ -18,30 +144,58 @@ class FunctionRegistry:
         func: Callable,
         description: str,
         inputSchema: Dict[str, Any] = None,
-    ):
-        """Register a new function in the registry."""
-        self.functions[name] = func
-        self.metadata[name] = {
-            "name": name,
-            "description": description,
-            "inputSchema": inputSchema or {},
-        }
+    ) -> FunctionEntry:
+        """Register a new function in the registry.
+
+        When no inputSchema is given it is inferred from the function signature.
+        """
+        # Names come in as fresh strings from JSON, intern them for faster lookups
+        name = sys.intern(name)
+        if not inputSchema:
+            inputSchema = infer_input_schema(func)
+        if name not in self._entries:
+            bisect.insort(self._sorted_names, name)
+        entry = self._entries[name] = FunctionEntry(
+            func=func,
+            metadata={
+                "name": name,
+                "description": description,
+                "inputSchema": inputSchema,
+            },
+            usage_example=build_usage_example(name, inputSchema),
+            validator=build_validator(inputSchema),
+        )
+        self._listing = None
+        return entry
+
+    def get_entry(self, name: str) -> Optional[FunctionEntry]:
+        """Get a function and its metadata by name."""
+        return self._entries.get(name)
 
     def get_function(self, name: str) -> Optional[Callable]:
         """Get a function by name."""
-        return self.functions.get(name)
+        entry = self._entries.get(name)
+        return entry.func if entry else None
 
     def get_metadata(self, name: str) -> Optional[Dict[str, Any]]:
         """Get function metadata by name."""
-        return self.metadata.get(name)
+        entry = self._entries.get(name)
+        return entry.metadata if entry else None
 
     def list_functions(self) -> List[Dict[str, Any]]:
-        """List all registered functions."""
-        return [self.metadata[name] for name in sorted(self.functions.keys())]
+        """List all registered functions.
+
+        The list is cached between registrations and must be treated as read-only.
+        """
+        if self._listing is None:
+            self._listing = [
+                self._entries[name].metadata for name in self._sorted_names
+            ]
+        return self._listing
 
     def has_function(self, name: str) -> bool:
         """Check if a function exists."""
-        return name in self.functions
+        return name in self._entries
 
 
 registry = FunctionRegistry()
@@ -93,13 +247,16 @@ def add_function(
             }
 
         # Track if we're replacing an existing function
-        function_exists = registry.has_function(name) or hasattr(mcp, name)
+        function_exists = registry.has_function(name) or name in BUILT_IN_FUNCTION_NAMES
 
         # Validate the code
         try:
+            # Check the function is defined before running any of the code
+            code_obj = compile_function_code(name, code)
+
             # Add the function to the global namespace
             namespace = {}
-            exec(code, namespace)
+            exec(code_obj, namespace)
 
             # Get the function
             if name not in namespace:
@@ -118,10 +275,10 @@ def add_function(
                 }
 
             # Register the function, overwriting if it already exists
-            registry.register(name, func, description, inputSchema)
+            entry = registry.register(name, func, description, inputSchema)
 
             # Get the parameter information to return
-            params = registry.get_metadata(name)["inputSchema"]
+            params = entry.metadata["inputSchema"]
 
             # Determine the appropriate status message
             status_msg = "added" if not function_exists else "updated"
@@ -132,6 +289,8 @@ def add_function(
                 "inputSchema": params,
             }
 
+        except InvalidFunctionCodeError as e:
+            return {"status": "error", "message": str(e)}
         except SyntaxError as e:
             return {
                 "status": "error",
@@ -160,49 +319,38 @@ def call_function(name: str, args: Dict[str, Any] = None) -> Dict[str, Any]:
 
     try:
         # Get the function
-        function = registry.get_function(name)
+        entry = registry.get_entry(sys.intern(name))
 
-        if not function:
+        if entry is None:
             return {
                 "status": "error",
                 "message": f"Function '{name}' not found",
                 "available_functions": [t["name"] for t in registry.list_functions()],
             }
 
+        # Check the arguments against the function's inputSchema
+        if entry.validator is not None:
+            error = jsonschema_exceptions.best_match(entry.validator.iter_errors(args))
+            if error is not None:
+                return {
+                    "status": "error",
+                    "message": f"Invalid arguments for function '{name}' at {error.json_path}: {error.message}",
+                    "path": list(error.absolute_path),
+                    "inputSchema": entry.metadata["inputSchema"],
+                    "example": entry.usage_example,
+                }
+
         # Call the function with the provided arguments
         try:
-            result = function(**args)
+            result = entry.func(**args)
             return result
         except TypeError as e:
             # Likely an argument mismatch
-            params = registry.get_metadata(name)["inputSchema"]
-
-            # Build a usage example with actual parameter names
-            param_examples = {}
-
-            # Handle different possible inputSchema structures
-            if isinstance(params, dict):
-                if "properties" in params:
-                    # Standard JSON Schema format
-                    for param_name in params["properties"]:
-                        param_examples[param_name] = f"<{param_name}_value>"
-                else:
-                    # Simple dict of param_name -> description
-                    for param_name in params:
-                        param_examples[param_name] = f"<{param_name}_value>"
-
-            # If no parameters found or empty schema, provide generic example
-            if not param_examples:
-                param_examples = {"param1": "<value1>", "param2": "<value2>"}
-
-            # Format the dictionary for better readability
-            usage_str = str(param_examples).replace("'<", "<").replace(">'", ">")
-
             return {
                 "status": "error",
                 "message": f"Argument error calling function '{name}': {str(e)}. Please fix your mistakes, add proper 'args' values!",
-                "inputSchema": params,
-                "example": f"call_function(name='{name}', args={usage_str})",
+                "inputSchema": entry.metadata["inputSchema"],
+                "example": entry.usage_example,
             }
         except Exception as e:
             return {
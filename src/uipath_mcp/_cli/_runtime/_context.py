@@ -30,10 +30,13 @@ class UiPathServerType(Enum):
     @classmethod
     def get_description(cls, server_type: "UiPathServerType") -> str:
         """Get description for a server type."""
-        descriptions = {
-            cls.UiPath: "Standard UiPath server for Processes, Agents, and Activities",
-            cls.Command: "Command server types like npx, uvx",
-            cls.Coded: "Coded MCP server (PackageType.MCPServer)",
-            cls.SelfHosted: "Tunnel to externally hosted server",
-        }
-        return descriptions.get(server_type, "Unknown server type")
+        return _SERVER_TYPE_DESCRIPTIONS.get(server_type, "Unknown server type")
+
+
+# Built once at import; enum class bodies would turn a dict attribute into a member
+_SERVER_TYPE_DESCRIPTIONS = {
+    UiPathServerType.UiPath: "Standard UiPath server for Processes, Agents, and Activities",
+    UiPathServerType.Command: "Command server types like npx, uvx",
+    UiPathServerType.Coded: "Coded MCP server (PackageType.MCPServer)",
+    UiPathServerType.SelfHosted: "Tunnel to externally hosted server",
+}
@@ -3,6 +3,7 @@
 import json
 import logging
 import os
+import re
 import uuid
 from typing import Any
 
@@ -20,6 +21,23 @@ from uipath_mcp._cli._utils._config import McpConfig
 
 logger = logging.getLogger(__name__)
 
+# Canonical 8-4-4-4-12 form, the one runtime ids are normally passed in
+_UUID_RE = re.compile(
+    r"\A[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\Z"
+)
+
+
+def _is_valid_uuid(value: str) -> bool:
+    """Check whether value is a UUID string accepted by uuid.UUID."""
+    if _UUID_RE.match(value):
+        return True
+    # Fall back for the other spellings uuid.UUID accepts (braces, urn:, no dashes)
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
 
 class UiPathMcpRuntimeFactory:
     """Factory for creating MCP runtimes from mcp.json configuration."""
@@ -35,6 +53,7 @@ class UiPathMcpRuntimeFactory:
         """
         self.context = context
         self._mcp_config: McpConfig | None = None
+        self._server_names: list[str] | None = None
 
     def _load_mcp_config(self) -> McpConfig:
         """Load mcp.json configuration."""
@@ -42,6 +61,12 @@ class UiPathMcpRuntimeFactory:
             self._mcp_config = McpConfig()
         return self._mcp_config
 
+    def _get_server_names(self, mcp_config: McpConfig) -> list[str]:
+        """Get the server names from mcp.json, cached after the first call."""
+        if self._server_names is None:
+            self._server_names = mcp_config.get_server_names()
+        return self._server_names
+
     def discover_entrypoints(self) -> list[str]:
         """Discover all MCP server entrypoints.
 
@@ -51,7 +76,7 @@ class UiPathMcpRuntimeFactory:
         mcp_config = self._load_mcp_config()
         if not mcp_config.exists:
             return []
-        return mcp_config.get_server_names()
+        return self._get_server_names(mcp_config)
 
     def _mcp_slug(self, entrypoint: str) -> str:
         """Loads the mcp slug from the uipath.config if available, otherwise it will use the entrypoint."""
@@ -105,7 +130,7 @@ class UiPathMcpRuntimeFactory:
         logger.info("Creating MCP runtime for entrypoint '%s'", entrypoint)
         logger.info(server)
         if not server:
-            available = ", ".join(mcp_config.get_server_names())
+            available = ", ".join(self._get_server_names(mcp_config))
             raise UiPathMcpRuntimeError(
                 McpErrorCode.SERVER_NOT_FOUND,
                 "MCP server not found",
@@ -131,9 +156,7 @@ class UiPathMcpRuntimeFactory:
                 )
 
         # Validate runtime_id is a valid UUID, generate new one if not
-        try:
-            uuid.UUID(runtime_id)
-        except ValueError:
+        if not _is_valid_uuid(runtime_id):
             new_id = str(uuid.uuid4())
             logger.warning(
                 "Invalid runtime_id '%s' is not a valid UUID; generated '%s'",
@@ -166,3 +189,4 @@ class UiPathMcpRuntimeFactory:
     async def dispose(self) -> None:
         """Cleanup factory resources."""
         self._mcp_config = None
+        self._server_names = None
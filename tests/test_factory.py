@@ -9,6 +9,7 @@ import pytest
 from uipath_mcp._cli._runtime import register_runtime_factory
 from uipath_mcp._cli._runtime._exception import UiPathMcpRuntimeError
 from uipath_mcp._cli._runtime._factory import UiPathMcpRuntimeFactory
+from uipath_mcp._cli._utils._config import McpConfig
 
 
 def _make_context(tmp_path: Path, config: dict[str, object] | None = None) -> MagicMock:
@@ -39,6 +40,19 @@ async def test_discover_entrypoints_returns_names(tmp_path: Path, factory):
     assert set(factory.discover_entrypoints()) == {"a", "b"}
 
 
+@pytest.mark.asyncio
+async def test_discover_entrypoints_caches_names(tmp_path: Path, factory):
+    (tmp_path / "mcp.json").write_text(json.dumps({"servers": {"a": {}, "b": {}}}))
+    with patch.object(
+        McpConfig, "get_server_names", autospec=True, return_value=["a", "b"]
+    ) as get_names:
+        assert factory.discover_entrypoints() == ["a", "b"]
+        assert factory.discover_entrypoints() == ["a", "b"]
+        with pytest.raises(UiPathMcpRuntimeError, match="Available: a, b"):
+            await factory.new_runtime("missing", "id")
+    get_names.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_new_runtime_raises_when_no_config(factory):
     with pytest.raises(UiPathMcpRuntimeError):
@@ -113,6 +127,24 @@ async def test_new_runtime_invalid_uuid_is_regenerated(tmp_path: Path, factory):
     assert kwargs["runtime_id"] != "not-a-uuid"
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "runtime_id",
+    [
+        "0f8fad5b-d9cb-469f-a165-70867728950e",
+        "0F8FAD5B-D9CB-469F-A165-70867728950E",
+        "{0f8fad5b-d9cb-469f-a165-70867728950e}",
+        "0f8fad5bd9cb469fa16570867728950e",
+    ],
+)
+async def test_new_runtime_valid_uuid_is_kept(tmp_path: Path, factory, runtime_id: str):
+    (tmp_path / "mcp.json").write_text(json.dumps({"servers": {"a": {"command": "x"}}}))
+    factory._mcp_config = None
+    with patch("uipath_mcp._cli._runtime._factory.UiPathMcpRuntime") as rt_cls:
+        await factory.new_runtime("a", runtime_id)
+    assert rt_cls.call_args.kwargs["runtime_id"] == runtime_id
+
+
 @pytest.mark.asyncio
 async def test_get_storage_returns_none(factory):
     assert await factory.get_storage() is None
@@ -126,8 +158,10 @@ async def test_get_settings_returns_none(factory):
 @pytest.mark.asyncio
 async def test_dispose_clears_config(factory):
     factory._mcp_config = MagicMock()
+    factory._server_names = ["a"]
     await factory.dispose()
     assert factory._mcp_config is None
+    assert factory._server_names is None
 
 
 def test_mcp_slug_from_config(tmp_path: Path):